@@ -0,0 +1,27 @@
+"""
+Hypercorn configuration for the crew-control service
+Used by the production image instead of the Quart development server
+"""
+import os
+
+bind = [f"0.0.0.0:{os.getenv('CREW_CONTROL_PORT', '3007')}"]
+
+# Each worker process runs its own uvloop event loop and serves many in-flight
+# workflows concurrently on it. Every worker also has its own agent connection
+# pools (AGENT_CONN_LIMIT per agent host) and health cache, so the count stays
+# small by default: the CPUs this process may use, capped at 2. Containers
+# often see the host's cores, so set WEB_CONCURRENCY to match the CPU quota.
+if hasattr(os, 'sched_getaffinity'):
+    _available_cpus = len(os.sched_getaffinity(0))
+else:
+    _available_cpus = os.cpu_count() or 1
+
+workers = int(os.getenv('WEB_CONCURRENCY', min(_available_cpus, 2)))
+worker_class = 'uvloop'
+
+graceful_timeout = 30
+keep_alive_timeout = 60
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').upper()
@@ -0,0 +1,144 @@
+"""
+HTTP client for the RAG agent services
+Wraps a shared aiohttp session so workflow steps reuse pooled connections
+"""
+import asyncio
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+import aiohttp
+
+
+class BatchQueue:
+    """
+    Coalesces concurrent calls to one agent route into a single batched POST.
+
+    Callers await apply(item); items arriving within the batching window are
+    sent together as {"items": [...]} to the route's /batch variant, which must
+    answer with {"results": [...]} in the same order.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        timeout: float,
+        window: float,
+        max_size: int
+    ):
+        self.session = session
+        self.url = url
+        self.timeout = timeout
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def apply(self, item: Dict[str, Any]) -> Any:
+        """Queue an item and wait for its result from the next batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send everything queued so far as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """POST a batch and resolve each waiting caller with its own result."""
+        try:
+            async with self.session.post(
+                self.url,
+                json={'items': [item for item, _ in batch]},
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                body = await response.json(content_type=None)
+
+            results = body.get('results') if isinstance(body, dict) else None
+            if not isinstance(results, list) or len(results) != len(batch):
+                raise ValueError(f"Invalid batch response from {self.url}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class AgentClient:
+    """Calls agent services through a single long-lived aiohttp session."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        endpoints: Dict[str, str],
+        batch_agents: Iterable[str] = (),
+        batch_window: float = 0.005,
+        batch_max_size: int = 32
+    ):
+        self.session = session
+        self.endpoints = endpoints
+        self.batch_agents = frozenset(batch_agents)
+        self.batch_window = batch_window
+        self.batch_max_size = batch_max_size
+        self._batch_queues: Dict[Tuple[str, str], BatchQueue] = {}
+
+    def __contains__(self, agent_name: str) -> bool:
+        return agent_name in self.endpoints
+
+    async def post(
+        self,
+        agent_name: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float
+    ) -> Any:
+        """POST a JSON payload to an agent and return the decoded JSON body."""
+        try:
+            if agent_name in self.batch_agents:
+                return await self._batch_queue(agent_name, path, timeout).apply(payload)
+
+            async with self.session.post(
+                f"{self.endpoints[agent_name]}{path}",
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                return await response.json(content_type=None)
+        except asyncio.TimeoutError as e:
+            # aiohttp raises a bare TimeoutError with no message; say what timed out
+            raise asyncio.TimeoutError(
+                f"{agent_name} agent {path} timed out after {timeout:g}s"
+            ) from e
+
+    def _batch_queue(self, agent_name: str, path: str, timeout: float) -> BatchQueue:
+        """Get or create the batch queue for an agent route."""
+        key = (agent_name, path)
+        queue = self._batch_queues.get(key)
+        if queue is None:
+            queue = BatchQueue(
+                self.session,
+                f"{self.endpoints[agent_name]}{path}/batch",
+                timeout=timeout,
+                window=self.batch_window,
+                max_size=self.batch_max_size
+            )
+            self._batch_queues[key] = queue
+        return queue
@@ -1,10 +1,23 @@
-from flask import Flask, jsonify, request
+from quart import Quart, jsonify, make_response, request
+from quart.json.provider import DefaultJSONProvider
 import os
 import asyncio
+import time
 import uuid
 from datetime import datetime
+from functools import lru_cache
 import logging
 from dotenv import load_dotenv
+import aiohttp
+import orjson
+from pydantic import ValidationError
+
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    # uvloop is unavailable on Windows; fall back to the default loop
+    pass
 
 # Load environment variables
 load_dotenv()
@@ -16,6 +29,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from agent_client import AgentClient
+from schemas import QueryRequest, IngestRequest, BatchIngestRequest
+
 # Import workflows
 try:
     from workflows import QueryWorkflow, IngestionWorkflow, WorkflowContext
@@ -24,9 +40,25 @@ except ImportError as e:
     logger.warning(f"Workflows not available: {e}")
     WORKFLOWS_AVAILABLE = False
 
-app = Flask(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes and parses with orjson."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
 
 # Configuration
+APP_VERSION = os.getenv('APP_VERSION', '1.0.0')
+NODE_ENV = os.getenv('NODE_ENV', 'development')
+CREW_CONTROL_PORT = int(os.getenv('CREW_CONTROL_PORT', '3007'))
+
 AGENT_ENDPOINTS = {
     'query-parser': os.getenv('AGENT_QUERY_PARSER_URL', 'http://query-parser-agent:3002'),
     'ingestion': os.getenv('AGENT_INGESTION_URL', 'http://ingestion-agent:3001'),
@@ -36,31 +68,207 @@ AGENT_ENDPOINTS = {
     'validation': os.getenv('AGENT_VALIDATION_URL', 'http://validation-agent:3006')
 }
 
+# Maximum number of documents ingested concurrently by a batch request
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+
+# Seconds a single batch document may spend in its ingestion workflow
+INGEST_TIMEOUT = float(os.getenv('INGEST_TIMEOUT', '120'))
+
+# Maximum concurrent connections to each agent host
+AGENT_CONN_LIMIT = int(os.getenv('AGENT_CONN_LIMIT', '64'))
+
+# Agent health probing: per-probe timeout and how long results are reused
+HEALTH_PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', '2'))
+HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', '5'))
+AGENT_STATUS_CACHE_TTL = float(os.getenv('AGENT_STATUS_CACHE_TTL', '10'))
+
+# Agents whose routes accept coalesced {"items": [...]} calls on <route>/batch
+AGENT_BATCH_AGENTS = [
+    name.strip() for name in os.getenv('AGENT_BATCH_AGENTS', '').split(',') if name.strip()
+]
+AGENT_BATCH_WINDOW_MS = float(os.getenv('AGENT_BATCH_WINDOW_MS', '5'))
+AGENT_BATCH_MAX_SIZE = int(os.getenv('AGENT_BATCH_MAX_SIZE', '32'))
+
+# Request body limits: ingestion payloads can run to many MB, so the size is
+# unlimited unless MAX_CONTENT_LENGTH (bytes) is set
+MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', '0')) or None
+REQUEST_BODY_TIMEOUT = float(os.getenv('REQUEST_BODY_TIMEOUT', '60'))
+
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+app.config['BODY_TIMEOUT'] = REQUEST_BODY_TIMEOUT
+
+
+# Workflows are stateless, so every request shares one instance of each
+if WORKFLOWS_AVAILABLE:
+    _QUERY_WF = QueryWorkflow()
+    _INGEST_WF = IngestionWorkflow()
+
+# Pooled HTTP session shared by agent calls and health probes; it is bound to
+# the serving loop, so it is created once that loop is running
+_HTTP_SESSION = None
+_AGENT_CLIENT = None
+
+
+@app.before_serving
+async def _startup():
+    """Prepare the serving loop and open the shared HTTP session."""
+    global _HTTP_SESSION, _AGENT_CLIENT
+    
+    if hasattr(asyncio, 'eager_task_factory'):
+        # Python 3.12+: run new tasks synchronously until their first real await
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
+    # No global cap: each agent host gets its own pool so one busy agent
+    # cannot starve the others
+    _HTTP_SESSION = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=0,
+            limit_per_host=AGENT_CONN_LIMIT,
+            keepalive_timeout=60,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+    )
+    _AGENT_CLIENT = AgentClient(
+        _HTTP_SESSION,
+        AGENT_ENDPOINTS,
+        batch_agents=AGENT_BATCH_AGENTS,
+        batch_window=AGENT_BATCH_WINDOW_MS / 1000,
+        batch_max_size=AGENT_BATCH_MAX_SIZE
+    )
+
+
+@app.after_serving
+async def _shutdown():
+    """Close the shared HTTP session."""
+    await _HTTP_SESSION.close()
+
+
+# Random bytes for trace IDs, refilled one os.urandom block at a time. The buffer
+# starts empty so forked workers never share entropy, and it needs no lock
+# because handlers run on a single event loop per process.
+_TRACE_ID_ENTROPY_BLOCK = 4096
+_trace_id_entropy = b''
+_trace_id_offset = 0
+
+
+def _new_trace_id():
+    """Return a random UUID4 string without a urandom syscall per call."""
+    global _trace_id_entropy, _trace_id_offset
+    
+    if _trace_id_offset >= len(_trace_id_entropy):
+        _trace_id_entropy = os.urandom(_TRACE_ID_ENTROPY_BLOCK)
+        _trace_id_offset = 0
+    
+    raw = _trace_id_entropy[_trace_id_offset:_trace_id_offset + 16]
+    _trace_id_offset += 16
+    return str(uuid.UUID(bytes=raw, version=4))
+
+
+@lru_cache(maxsize=1)
+def _iso_timestamp(epoch_seconds):
+    """Format a whole-second epoch timestamp as local ISO 8601."""
+    return datetime.fromtimestamp(epoch_seconds).isoformat()
+
+
+def _now_iso():
+    """Current local time as ISO 8601, formatted at most once per second."""
+    return _iso_timestamp(int(time.time()))
+
+
+async def _probe_agent(endpoint, timeout, checked_at):
+    """Probe a single agent's /health endpoint."""
+    try:
+        async with _HTTP_SESSION.get(
+            f"{endpoint}/health",
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            return {
+                'online': response.status == 200,
+                'endpoint': endpoint,
+                'lastChecked': checked_at
+            }
+    except Exception as e:
+        return {
+            'online': False,
+            'endpoint': endpoint,
+            'error': str(e) or type(e).__name__,
+            'lastChecked': checked_at
+        }
+
+
+async def _probe_agents(timeout):
+    """Probe every agent's /health endpoint concurrently."""
+    checked_at = _now_iso()
+    results = await asyncio.gather(
+        *(_probe_agent(endpoint, timeout, checked_at) for endpoint in AGENT_ENDPOINTS.values())
+    )
+    return dict(zip(AGENT_ENDPOINTS.keys(), results))
+
+
+_HEALTH_CACHE = {'ts': 0.0, 'value': None}
+_HEALTH_CACHE_LOCK = asyncio.Lock()
+
+
+async def _cached_agent_status(ttl):
+    """Return agent probe results, probing again only once they are older than ttl."""
+    async with _HEALTH_CACHE_LOCK:
+        if (
+            _HEALTH_CACHE['value'] is not None
+            and time.monotonic() - _HEALTH_CACHE['ts'] < ttl
+        ):
+            return _HEALTH_CACHE['value']
+        
+        value = await _probe_agents(timeout=HEALTH_PROBE_TIMEOUT)
+        _HEALTH_CACHE.update(ts=time.monotonic(), value=value)
+        return value
+
+
+_INGESTION_HEALTH = {'ts': 0.0, 'online': True}
+_INGESTION_HEALTH_LOCK = asyncio.Lock()
+
+
+async def _ingestion_agent_online():
+    """Whether the ingestion agent is up, probing only that agent when no fresh result is cached."""
+    if (
+        _HEALTH_CACHE['value'] is not None
+        and time.monotonic() - _HEALTH_CACHE['ts'] < HEALTH_CACHE_TTL
+    ):
+        return _HEALTH_CACHE['value']['ingestion']['online']
+    
+    async with _INGESTION_HEALTH_LOCK:
+        if time.monotonic() - _INGESTION_HEALTH['ts'] >= HEALTH_CACHE_TTL:
+            result = await _probe_agent(AGENT_ENDPOINTS['ingestion'], HEALTH_PROBE_TIMEOUT, _now_iso())
+            _INGESTION_HEALTH.update(ts=time.monotonic(), online=result['online'])
+        return _INGESTION_HEALTH['online']
+
 
 # ============ Health Checks ============
 
+# Static part of the /health payload; only the timestamp changes per request
+HEALTH_PAYLOAD_BASE = {
+    'status': 'healthy',
+    'service': 'crew-control',
+    'version': APP_VERSION
+}
+
+
 @app.route('/health', methods=['GET'])
-def health():
+async def health():
     """Health check endpoint."""
     return jsonify({
-        'status': 'healthy',
-        'service': 'crew-control',
-        'timestamp': datetime.now().isoformat(),
-        'version': os.getenv('APP_VERSION', '1.0.0')
+        **HEALTH_PAYLOAD_BASE,
+        'timestamp': _now_iso()
     })
 
 
 @app.route('/ready', methods=['GET'])
-def ready():
+async def ready():
     """Readiness check endpoint."""
-    agents_status = {}
-    for agent_name, endpoint in AGENT_ENDPOINTS.items():
-        try:
-            import requests
-            response = requests.get(f"{endpoint}/health", timeout=2)
-            agents_status[agent_name] = response.status_code == 200
-        except:
-            agents_status[agent_name] = False
+    agents_status = {
+        agent_name: status['online']
+        for agent_name, status in (await _cached_agent_status(HEALTH_CACHE_TTL)).items()
+    }
     
     all_ready = all(agents_status.values())
     
@@ -74,8 +282,34 @@ def ready():
 
 # ============ Workflow Orchestration Endpoints ============
 
+# Validation error types that mean a required field was left out or empty
+_MISSING_FIELD_ERRORS = frozenset({'missing', 'string_too_short', 'too_short'})
+
+
+def _invalid_request(error, message, required_fields):
+    """Build the INVALID_REQUEST response for a failed request body validation."""
+    first = error.errors()[0]
+    loc = first['loc']
+    # A null required field counts as missing, like an empty one
+    missing = first['type'] in _MISSING_FIELD_ERRORS or first['input'] is None
+    if not loc:
+        # Malformed JSON or a body that is not an object
+        message = first['msg']
+    elif len(loc) > 1 or loc[0] not in required_fields or not missing:
+        # Point at the offending value instead of the generic message
+        message = f"{'.'.join(str(part) for part in loc)}: {first['msg']}"
+    
+    return jsonify({
+        'success': False,
+        'error': {
+            'code': 'INVALID_REQUEST',
+            'message': message
+        }
+    }), 400
+
+
 @app.route('/api/workflows/query', methods=['POST'])
-def execute_query_workflow():
+async def execute_query_workflow():
     """
     Execute the complete query processing workflow.
     
@@ -89,45 +323,33 @@ def execute_query_workflow():
         }
     }
     """
+    # Read outside the try so size and timeout errors keep their HTTP status
+    raw_body = await request.get_data()
+    
     try:
-        data = request.json
-        query = data.get('query')
-        document_ids = data.get('documentIds')
-        context_data = data.get('context', {})
+        try:
+            body = QueryRequest.model_validate_json(raw_body)
+        except ValidationError as e:
+            return _invalid_request(e, 'Query is required', ('query',))
         
-        if not query:
-            return jsonify({
-                'success': False,
-                'error': {
-                    'code': 'INVALID_REQUEST',
-                    'message': 'Query is required'
-                }
-            }), 400
+        query = body.query
+        document_ids = body.documentIds
+        context_data = body.context
         
         # Create workflow context
-        trace_id = str(uuid.uuid4())
+        trace_id = _new_trace_id()
         user_id = context_data.get('userId', 'anonymous')
         context = WorkflowContext(trace_id=trace_id, user_id=user_id, metadata=context_data)
         
         logger.info(f"[{trace_id}] Executing query workflow: {query}")
         
         # Execute workflow
-        workflow = QueryWorkflow()
-        
-        # Run async workflow
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(
-                workflow.execute(
-                    query=query,
-                    document_ids=document_ids,
-                    context=context,
-                    agent_endpoints=AGENT_ENDPOINTS
-                )
-            )
-        finally:
-            loop.close()
+        result = await _QUERY_WF.execute(
+            query=query,
+            document_ids=document_ids,
+            context=context,
+            agent_client=_AGENT_CLIENT
+        )
         
         return jsonify(result), 200 if result.get('success') else 500
         
@@ -143,7 +365,7 @@ def execute_query_workflow():
 
 
 @app.route('/api/workflows/ingest', methods=['POST'])
-def execute_ingest_workflow():
+async def execute_ingest_workflow():
     """
     Execute the document ingestion workflow.
     
@@ -157,45 +379,33 @@ def execute_ingest_workflow():
         }
     }
     """
+    # Read outside the try so size and timeout errors keep their HTTP status
+    raw_body = await request.get_data()
+    
     try:
-        data = request.json
-        document_id = data.get('documentId')
-        content = data.get('content')
-        context_data = data.get('context', {})
+        try:
+            body = IngestRequest.model_validate_json(raw_body)
+        except ValidationError as e:
+            return _invalid_request(e, 'documentId and content are required', ('documentId', 'content'))
         
-        if not document_id or not content:
-            return jsonify({
-                'success': False,
-                'error': {
-                    'code': 'INVALID_REQUEST',
-                    'message': 'documentId and content are required'
-                }
-            }), 400
+        document_id = body.documentId
+        content = body.content
+        context_data = body.context
         
         # Create workflow context
-        trace_id = str(uuid.uuid4())
+        trace_id = _new_trace_id()
         user_id = context_data.get('userId', 'anonymous')
         context = WorkflowContext(trace_id=trace_id, user_id=user_id, metadata=context_data)
         
         logger.info(f"[{trace_id}] Executing ingestion workflow for document: {document_id}")
         
         # Execute workflow
-        workflow = IngestionWorkflow()
-        
-        # Run async workflow
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(
-                workflow.execute(
-                    document_id=document_id,
-                    document_content=content,
-                    context=context,
-                    agent_endpoints=AGENT_ENDPOINTS
-                )
-            )
-        finally:
-            loop.close()
+        result = await _INGEST_WF.execute(
+            document_id=document_id,
+            document_content=content,
+            context=context,
+            agent_client=_AGENT_CLIENT
+        )
         
         return jsonify(result), 200 if result.get('success') else 500
         
@@ -210,8 +420,88 @@ def execute_ingest_workflow():
         }), 500
 
 
+async def _ingest_batch_document(doc_id, content, trace_id, semaphore):
+    """Run the ingestion workflow for one document of a batch."""
+    context = WorkflowContext(
+        trace_id=f"{trace_id}-{doc_id}",
+        user_id='batch-ingest'
+    )
+    try:
+        async with semaphore:
+            result = await asyncio.wait_for(
+                _INGEST_WF.execute(
+                    document_id=doc_id,
+                    document_content=content,
+                    context=context,
+                    agent_client=_AGENT_CLIENT
+                ),
+                timeout=INGEST_TIMEOUT
+            )
+    except asyncio.TimeoutError:
+        logger.warning(f"[{context.trace_id}] Ingestion timed out after {INGEST_TIMEOUT:g}s")
+        result = {
+            'success': False,
+            'error': {
+                'code': 'INGESTION_TIMEOUT',
+                'message': f'Ingestion did not complete within {INGEST_TIMEOUT:g} seconds',
+                'traceId': context.trace_id
+            }
+        }
+    except Exception as e:
+        result = {
+            'success': False,
+            'error': {
+                'code': 'INGESTION_WORKFLOW_FAILED',
+                'message': str(e)
+            }
+        }
+    
+    return {
+        'documentId': doc_id,
+        **result
+    }
+
+
+def _batch_summary(trace_id, total, successful):
+    """Log and build the summary for a finished batch ingestion."""
+    failed = total - successful
+    logger.info(f"[{trace_id}] Batch ingestion completed: {successful} successful, {failed} failed")
+    return {
+        'success': failed == 0,
+        'summary': {
+            'total': total,
+            'successful': successful,
+            'failed': failed
+        }
+    }
+
+
+async def _stream_batch_ingest(trace_id, total, rejected, pending, semaphore):
+    """Yield NDJSON result lines as documents finish, then a summary line."""
+    # Workflows start with the stream, so nothing runs if the client leaves first
+    tasks = [
+        asyncio.ensure_future(_ingest_batch_document(doc_id, content, trace_id, semaphore))
+        for doc_id, content in pending
+    ]
+    successful = 0
+    try:
+        for result in rejected:
+            yield app.json.dumps(result) + '\n'
+        
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            successful += bool(result.get('success', False))
+            yield app.json.dumps(result) + '\n'
+    finally:
+        # Stop outstanding workflows if the client goes away mid-stream
+        for task in tasks:
+            task.cancel()
+    
+    yield app.json.dumps(_batch_summary(trace_id, total, successful)) + '\n'
+
+
 @app.route('/api/workflows/batch-ingest', methods=['POST'])
-def execute_batch_ingest_workflow():
+async def execute_batch_ingest_workflow():
     """
     Execute batch ingestion for multiple documents.
     
@@ -225,72 +515,83 @@ def execute_batch_ingest_workflow():
             ...
         ]
     }
+    
+    Clients sending "Accept: application/x-ndjson" receive one JSON line per
+    document as it completes, followed by a final summary line.
     """
+    # Read outside the try so size and timeout errors keep their HTTP status
+    raw_body = await request.get_data()
+    
     try:
-        data = request.json
-        documents = data.get('documents', [])
+        try:
+            body = BatchIngestRequest.model_validate_json(raw_body)
+        except ValidationError as e:
+            return _invalid_request(e, 'documents array is required', ('documents',))
         
-        if not documents:
-            return jsonify({
-                'success': False,
-                'error': {
-                    'code': 'INVALID_REQUEST',
-                    'message': 'documents array is required'
-                }
-            }), 400
+        documents = body.documents
         
-        trace_id = str(uuid.uuid4())
+        trace_id = _new_trace_id()
         logger.info(f"[{trace_id}] Starting batch ingestion of {len(documents)} documents")
         
-        results = []
-        for doc in documents:
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        results = [None] * len(documents)
+        pending = []
+        for index, doc in enumerate(documents):
             doc_id = doc.get('documentId')
             content = doc.get('content')
             
             if not doc_id or not content:
-                results.append({
+                results[index] = {
                     'documentId': doc_id,
                     'success': False,
                     'error': 'Missing documentId or content'
-                })
+                }
                 continue
             
-            context = WorkflowContext(
-                trace_id=f"{trace_id}-{doc_id}",
-                user_id='batch-ingest'
-            )
-            
-            workflow = IngestionWorkflow()
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(
-                    workflow.execute(
-                        document_id=doc_id,
-                        document_content=content,
-                        context=context,
-                        agent_endpoints=AGENT_ENDPOINTS
-                    )
-                )
-                results.append({
+            pending.append((index, doc_id, content))
+        
+        # Don't dispatch to an ingestion agent the health check says is down
+        if pending and not await _ingestion_agent_online():
+            for index, doc_id, _ in pending:
+                results[index] = {
                     'documentId': doc_id,
-                    **result
-                })
-            finally:
-                loop.close()
+                    'success': False,
+                    'error': {
+                        'code': 'AGENT_UNAVAILABLE',
+                        'message': 'Ingestion agent is unavailable'
+                    }
+                }
+            pending = []
         
-        successful = sum(1 for r in results if r.get('success', False))
-        failed = len(documents) - successful
+        accepted = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+        if accepted == 'application/x-ndjson':
+            rejected = [result for result in results if result is not None]
+            response = await make_response(
+                _stream_batch_ingest(
+                    trace_id,
+                    len(documents),
+                    rejected,
+                    [(doc_id, content) for _, doc_id, content in pending],
+                    semaphore
+                ),
+                200,
+                {'Content-Type': 'application/x-ndjson'}
+            )
+            # Large batches can stream for longer than the default response timeout
+            response.timeout = None
+            return response
+        
+        outcomes = await asyncio.gather(*(
+            _ingest_batch_document(doc_id, content, trace_id, semaphore)
+            for _, doc_id, content in pending
+        ))
+        for (index, _, _), outcome in zip(pending, outcomes):
+            results[index] = outcome
         
-        logger.info(f"[{trace_id}] Batch ingestion completed: {successful} successful, {failed} failed")
+        successful = sum(1 for r in results if r.get('success', False))
         
         return jsonify({
-            'success': failed == 0,
-            'summary': {
-                'total': len(documents),
-                'successful': successful,
-                'failed': failed
-            },
+            **_batch_summary(trace_id, len(documents), successful),
             'results': results
         }), 200
         
@@ -308,26 +609,9 @@ def execute_batch_ingest_workflow():
 # ============ Status & Management Endpoints ============
 
 @app.route('/api/agents/status', methods=['GET'])
-def get_agents_status():
+async def get_agents_status():
     """Get status of all connected agents."""
-    import requests
-    
-    status = {}
-    for agent_name, endpoint in AGENT_ENDPOINTS.items():
-        try:
-            response = requests.get(f"{endpoint}/health", timeout=3)
-            status[agent_name] = {
-                'online': response.status_code == 200,
-                'endpoint': endpoint,
-                'lastChecked': datetime.now().isoformat()
-            }
-        except Exception as e:
-            status[agent_name] = {
-                'online': False,
-                'endpoint': endpoint,
-                'error': str(e),
-                'lastChecked': datetime.now().isoformat()
-            }
+    status = await _cached_agent_status(AGENT_STATUS_CACHE_TTL)
     
     online_count = sum(1 for s in status.values() if s.get('online'))
     
@@ -342,18 +626,18 @@ def get_agents_status():
 
 
 @app.route('/api/config/agents', methods=['GET'])
-def get_agent_config():
+async def get_agent_config():
     """Get current agent endpoint configuration."""
     return jsonify({
         'agents': AGENT_ENDPOINTS,
-        'environment': os.getenv('NODE_ENV', 'development')
+        'environment': NODE_ENV
     })
 
 
 # ============ Error Handlers ============
 
 @app.errorhandler(404)
-def not_found(error):
+async def not_found(error):
     """Handle 404 errors."""
     return jsonify({
         'success': False,
@@ -364,8 +648,20 @@ def not_found(error):
     }), 404
 
 
+@app.errorhandler(413)
+async def payload_too_large(error):
+    """Handle request bodies over MAX_CONTENT_LENGTH."""
+    return jsonify({
+        'success': False,
+        'error': {
+            'code': 'PAYLOAD_TOO_LARGE',
+            'message': f'Request body exceeds {MAX_CONTENT_LENGTH} bytes'
+        }
+    }), 413
+
+
 @app.errorhandler(500)
-def internal_error(error):
+async def internal_error(error):
     """Handle 500 errors."""
     return jsonify({
         'success': False,
@@ -379,8 +675,8 @@ def internal_error(error):
 # ============ Application Entry Point ============
 
 if __name__ == '__main__':
-    port = int(os.getenv('CREW_CONTROL_PORT', 3007))
-    debug = os.getenv('NODE_ENV', 'development') == 'development'
+    port = CREW_CONTROL_PORT
+    debug = NODE_ENV == 'development'
     
     logger.info(f"Starting CrewAI Orchestration Service on port {port}")
     logger.info(f"Agent endpoints: {AGENT_ENDPOINTS}")
@@ -391,19 +687,3 @@ if __name__ == '__main__':
         debug=debug,
         use_reloader=False
     )
-
-        }
-    }), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({
-        'success': False,
-        'error': {
-            'code': 'INTERNAL_ERROR',
-            'message': 'An unexpected error occurred'
-        }
-    }), 500
-
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=4000, debug=os.getenv('FLASK_DEBUG') == '1')
@@ -3,9 +3,13 @@ CrewAI Configuration and Agent Definitions
 Defines agents and their capabilities for the RAG pipeline
 """
 import os
-import json
+import logging
 from typing import Optional, List, Dict, Any
 
+import orjson
+
+logger = logging.getLogger(__name__)
+
 try:
     from crewai import Agent, Task, Crew, Process
     from langchain.llms import OpenAI
@@ -23,30 +27,103 @@ except ImportError as e:
         def __init__(self, **kwargs):
             self.description = kwargs.get('description')
             self.expected_output = kwargs.get('expected_output')
+    
+    class OpenAI:
+        def __init__(self, **kwargs):
+            self.model_name = kwargs.get('model_name')
+            self.temperature = kwargs.get('temperature')
+
+# LLM settings
+OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')
+OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0.7'))
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# LLM client, created on first use so importing this module never needs OpenAI
+_llm = None
+
+
+def get_llm():
+    """Return the shared OpenAI LLM client, creating it on first use."""
+    global _llm
+    if _llm is None:
+        _llm = OpenAI(
+            model_name=OPENAI_MODEL,
+            temperature=OPENAI_TEMPERATURE,
+            api_key=OPENAI_API_KEY
+        )
+    return _llm
+
+
+# ============ Agent Profiles ============
+
+# Static role, goal and backstory text, shared by every Agent built for a role
+
+_QUERY_PARSER_PROFILE = {
+    'role': "Query Parser",
+    'goal': "Understand user queries and extract intent, entities, and required context",
+    'backstory': """You are an expert query analyst with deep understanding of information 
+            retrieval systems. You excel at breaking down complex questions, identifying intent, 
+            recognizing named entities, and determining what information is needed to answer the query."""
+}
+
+_RETRIEVAL_PROFILE = {
+    'role': "Document Retrieval Specialist",
+    'goal': "Find the most relevant documents and chunks for answering the user query",
+    'backstory': """You are a master of information retrieval with expertise in semantic search,
+            hybrid search strategies, and relevance scoring. You know how to find needles in 
+            haystacks and can work across multiple data sources and formats."""
+}
+
+_RANKING_PROFILE = {
+    'role': "Relevance Ranking Specialist",
+    'goal': "Rank retrieved documents and chunks by their relevance to the query",
+    'backstory': """You are an expert in information ranking with a deep understanding of 
+            relevance scoring, context matching, and importance measurement. You use multiple 
+            ranking factors to produce optimal orderings."""
+}
+
+_GENERATION_PROFILE = {
+    'role': "Response Generator",
+    'goal': "Generate comprehensive and accurate answers using retrieved context",
+    'backstory': """You are a brilliant writer and synthesizer of information. You excel at
+            combining multiple sources, maintaining accuracy, preserving citations, and producing
+            clear, well-structured responses tailored to the user's needs."""
+}
+
+_VALIDATION_PROFILE = {
+    'role': "Quality Assurance Specialist",
+    'goal': "Validate generated responses for accuracy, hallucinations, and quality",
+    'backstory': """You are a meticulous quality assurance expert with strong analytical skills.
+            You can detect hallucinations, verify facts, check citations, analyze coherence, and
+            ensure responses meet high quality standards before delivery."""
+}
+
+_INGESTION_PROFILE = {
+    'role': "Document Ingestion Specialist",
+    'goal': "Process, chunk, and prepare documents for retrieval",
+    'backstory': """You are an expert at data preparation with deep knowledge of document
+            processing, text chunking strategies, embedding generation, and index optimization.
+            You ensure documents are properly prepared for fast and accurate retrieval."""
+}
 
-# Initialize LLM
-llm = OpenAI(
-    model_name=os.getenv('OPENAI_MODEL', 'gpt-4'),
-    temperature=float(os.getenv('OPENAI_TEMPERATURE', '0.7')),
-    api_key=os.getenv('OPENAI_API_KEY')
-)
 
 # ============ Agent Definitions ============
 
 class RAGAgents:
-    """Container for all RAG pipeline agents."""
+    """
+    Container for all RAG pipeline agents.
+    
+    Each call builds a fresh Agent: a Crew attaches itself to its agents on
+    kickoff, so agents must not be shared between concurrently running crews.
+    """
     
     @staticmethod
     def query_parser_agent() -> Agent:
         """Agent responsible for parsing and understanding user queries."""
         return Agent(
-            role="Query Parser",
-            goal="Understand user queries and extract intent, entities, and required context",
-            backstory="""You are an expert query analyst with deep understanding of information 
-            retrieval systems. You excel at breaking down complex questions, identifying intent, 
-            recognizing named entities, and determining what information is needed to answer the query.""",
+            **_QUERY_PARSER_PROFILE,
             tools=[],  # Tools would be added from agent services
-            llm=llm,
+            llm=get_llm(),
             allow_delegation=False
         )
     
@@ -54,13 +131,9 @@ class RAGAgents:
     def retrieval_agent() -> Agent:
         """Agent responsible for finding relevant documents and chunks."""
         return Agent(
-            role="Document Retrieval Specialist",
-            goal="Find the most relevant documents and chunks for answering the user query",
-            backstory="""You are a master of information retrieval with expertise in semantic search,
-            hybrid search strategies, and relevance scoring. You know how to find needles in 
-            haystacks and can work across multiple data sources and formats.""",
+            **_RETRIEVAL_PROFILE,
             tools=[],
-            llm=llm,
+            llm=get_llm(),
             allow_delegation=False
         )
     
@@ -68,13 +141,9 @@ class RAGAgents:
     def ranking_agent() -> Agent:
         """Agent responsible for ranking retrieved documents by relevance."""
         return Agent(
-            role="Relevance Ranking Specialist",
-            goal="Rank retrieved documents and chunks by their relevance to the query",
-            backstory="""You are an expert in information ranking with a deep understanding of 
-            relevance scoring, context matching, and importance measurement. You use multiple 
-            ranking factors to produce optimal orderings.""",
+            **_RANKING_PROFILE,
             tools=[],
-            llm=llm,
+            llm=get_llm(),
             allow_delegation=False
         )
     
@@ -82,13 +151,9 @@ class RAGAgents:
     def generation_agent() -> Agent:
         """Agent responsible for generating answers from retrieved context."""
         return Agent(
-            role="Response Generator",
-            goal="Generate comprehensive and accurate answers using retrieved context",
-            backstory="""You are a brilliant writer and synthesizer of information. You excel at
-            combining multiple sources, maintaining accuracy, preserving citations, and producing
-            clear, well-structured responses tailored to the user's needs.""",
+            **_GENERATION_PROFILE,
             tools=[],
-            llm=llm,
+            llm=get_llm(),
             allow_delegation=False
         )
     
@@ -96,13 +161,9 @@ class RAGAgents:
     def validation_agent() -> Agent:
         """Agent responsible for validating generated responses."""
         return Agent(
-            role="Quality Assurance Specialist",
-            goal="Validate generated responses for accuracy, hallucinations, and quality",
-            backstory="""You are a meticulous quality assurance expert with strong analytical skills.
-            You can detect hallucinations, verify facts, check citations, analyze coherence, and
-            ensure responses meet high quality standards before delivery.""",
+            **_VALIDATION_PROFILE,
             tools=[],
-            llm=llm,
+            llm=get_llm(),
             allow_delegation=False
         )
     
@@ -110,25 +171,18 @@ class RAGAgents:
     def ingestion_agent() -> Agent:
         """Agent responsible for processing and indexing documents."""
         return Agent(
-            role="Document Ingestion Specialist",
-            goal="Process, chunk, and prepare documents for retrieval",
-            backstory="""You are an expert at data preparation with deep knowledge of document
-            processing, text chunking strategies, embedding generation, and index optimization.
-            You ensure documents are properly prepared for fast and accurate retrieval.""",
+            **_INGESTION_PROFILE,
             tools=[],
-            llm=llm,
+            llm=get_llm(),
             allow_delegation=False
         )
 
 
-class RAGTasks:
-    """Container for all RAG pipeline tasks."""
-    
-    @staticmethod
-    def parse_query_task(query: str, context: Dict[str, Any]) -> Task:
-        """Create a task for parsing the user's query."""
-        return Task(
-            description=f"""Analyze and parse the following user query:
+# ============ Task Prompt Templates ============
+
+# Built once at import; tasks only fill in the per-request values
+
+_PARSE_QUERY_TEMPLATE = """Analyze and parse the following user query:
             
 Query: "{query}"
 
@@ -139,21 +193,12 @@ Extract:
 4. Required context (what information is needed?)
 5. Any constraints or preferences mentioned
 
-Provide your analysis in JSON format with keys: intent, entities, questionType, requiredContext, constraints""",
-            expected_output="JSON object with parsed query analysis",
-            agent=RAGAgents.query_parser_agent()
-        )
-    
-    @staticmethod
-    def retrieve_documents_task(parsed_query: Dict[str, Any], document_ids: Optional[List[str]]) -> Task:
-        """Create a task for retrieving relevant documents."""
-        doc_filter = f"within documents: {document_ids}" if document_ids else "across all documents"
-        
-        return Task(
-            description=f"""Retrieve the most relevant documents and chunks for this parsed query:
+Provide your analysis in JSON format with keys: intent, entities, questionType, requiredContext, constraints"""
+
+_RETRIEVE_DOCUMENTS_TEMPLATE = """Retrieve the most relevant documents and chunks for this parsed query:
 
-Intent: {parsed_query.get('intent', 'Unknown')}
-Required Context: {parsed_query.get('requiredContext', 'General information')}
+Intent: {intent}
+Required Context: {required_context}
 
 Search {doc_filter}
 
@@ -163,16 +208,9 @@ Use hybrid search combining:
 3. Metadata filtering
 4. Relevance scoring
 
-Return the top 10 most relevant chunks with their scores and source documents.""",
-            expected_output="List of retrieved chunks with metadata and relevance scores",
-            agent=RAGAgents.retrieval_agent()
-        )
-    
-    @staticmethod
-    def rank_documents_task(retrieved_docs: List[Dict[str, Any]], query: str) -> Task:
-        """Create a task for ranking retrieved documents."""
-        return Task(
-            description=f"""Rank the following retrieved documents by relevance to the query:
+Return the top 10 most relevant chunks with their scores and source documents."""
+
+_RANK_DOCUMENTS_TEMPLATE = """Rank the following retrieved documents by relevance to the query:
 
 Query: "{query}"
 
@@ -184,23 +222,16 @@ Consider multiple factors:
 5. Complementary information value
 
 Documents:
-{json.dumps(retrieved_docs[:5], indent=2)}  # Show top 5 for brevity
+{documents}  # Show top 5 for brevity
 
-Provide final ranking with justification for each document.""",
-            expected_output="Ranked list of documents with relevance scores and justifications",
-            agent=RAGAgents.ranking_agent()
-        )
-    
-    @staticmethod
-    def generate_response_task(query: str, ranked_docs: List[Dict[str, Any]]) -> Task:
-        """Create a task for generating a response."""
-        return Task(
-            description=f"""Generate a comprehensive answer to this query using the provided context:
+Provide final ranking with justification for each document."""
+
+_GENERATE_RESPONSE_TEMPLATE = """Generate a comprehensive answer to this query using the provided context:
 
 Query: "{query}"
 
 Context (Top 3 sources):
-{json.dumps(ranked_docs[:3], indent=2)}
+{documents}
 
 Requirements:
 1. Base answer strictly on provided context
@@ -213,23 +244,16 @@ Provide response in JSON format with:
 - response: Main answer text
 - citations: List of cited chunks with references
 - confidence: Confidence level (0-1)
-- limitations: Any gaps or caveats""",
-            expected_output="JSON with generated response, citations, confidence, and limitations",
-            agent=RAGAgents.generation_agent()
-        )
-    
-    @staticmethod
-    def validate_response_task(generated_response: Dict[str, Any], original_docs: List[Dict[str, Any]]) -> Task:
-        """Create a task for validating the generated response."""
-        return Task(
-            description=f"""Validate this generated response for quality and accuracy:
+- limitations: Any gaps or caveats"""
 
-Response: {generated_response.get('response', '')}
-Citations: {generated_response.get('citations', [])}
-Confidence: {generated_response.get('confidence', 0)}
+_VALIDATE_RESPONSE_TEMPLATE = """Validate this generated response for quality and accuracy:
+
+Response: {response}
+Citations: {citations}
+Confidence: {confidence}
 
 Original Context:
-{json.dumps(original_docs[:2], indent=2)}
+{documents}
 
 Checks to perform:
 1. Hallucination detection - facts not in context?
@@ -242,19 +266,12 @@ Provide validation report with:
 - passed: Boolean (true if validation passes)
 - confidence: Confidence in validation (0-1)
 - issues: List of identified problems
-- suggestions: Recommended improvements""",
-            expected_output="JSON validation report with issues and suggestions",
-            agent=RAGAgents.validation_agent()
-        )
-    
-    @staticmethod
-    def ingest_document_task(document_id: str, document_content: str) -> Task:
-        """Create a task for ingesting a document."""
-        return Task(
-            description=f"""Prepare and process this document for the retrieval system:
+- suggestions: Recommended improvements"""
+
+_INGEST_DOCUMENT_TEMPLATE = """Prepare and process this document for the retrieval system:
 
 Document ID: {document_id}
-Content preview: {document_content[:500]}...
+Content preview: {content_preview}...
 
 Processing steps:
 1. Analyze document structure and content
@@ -268,7 +285,89 @@ Provide processing plan with:
 - chunkSize: Recommended chunk size (tokens)
 - metadata: Key metadata to extract
 - embeddingStrategy: How to handle embeddings
-- indexOptimization: Search optimization tips""",
+- indexOptimization: Search optimization tips"""
+
+
+def _dump_documents(docs: List[Dict[str, Any]]) -> str:
+    """Serialize documents for a prompt; compact unless debug logging is enabled."""
+    if logger.isEnabledFor(logging.DEBUG):
+        return orjson.dumps(docs, option=orjson.OPT_INDENT_2).decode()
+    return orjson.dumps(docs).decode()
+
+
+class RAGTasks:
+    """Container for all RAG pipeline tasks."""
+    
+    @staticmethod
+    def parse_query_task(query: str, context: Dict[str, Any]) -> Task:
+        """Create a task for parsing the user's query."""
+        return Task(
+            description=_PARSE_QUERY_TEMPLATE.format(query=query),
+            expected_output="JSON object with parsed query analysis",
+            agent=RAGAgents.query_parser_agent()
+        )
+    
+    @staticmethod
+    def retrieve_documents_task(parsed_query: Dict[str, Any], document_ids: Optional[List[str]]) -> Task:
+        """Create a task for retrieving relevant documents."""
+        doc_filter = f"within documents: {document_ids}" if document_ids else "across all documents"
+        
+        return Task(
+            description=_RETRIEVE_DOCUMENTS_TEMPLATE.format(
+                intent=parsed_query.get('intent', 'Unknown'),
+                required_context=parsed_query.get('requiredContext', 'General information'),
+                doc_filter=doc_filter
+            ),
+            expected_output="List of retrieved chunks with metadata and relevance scores",
+            agent=RAGAgents.retrieval_agent()
+        )
+    
+    @staticmethod
+    def rank_documents_task(retrieved_docs: List[Dict[str, Any]], query: str) -> Task:
+        """Create a task for ranking retrieved documents."""
+        return Task(
+            description=_RANK_DOCUMENTS_TEMPLATE.format(
+                query=query,
+                documents=_dump_documents(retrieved_docs[:5])
+            ),
+            expected_output="Ranked list of documents with relevance scores and justifications",
+            agent=RAGAgents.ranking_agent()
+        )
+    
+    @staticmethod
+    def generate_response_task(query: str, ranked_docs: List[Dict[str, Any]]) -> Task:
+        """Create a task for generating a response."""
+        return Task(
+            description=_GENERATE_RESPONSE_TEMPLATE.format(
+                query=query,
+                documents=_dump_documents(ranked_docs[:3])
+            ),
+            expected_output="JSON with generated response, citations, confidence, and limitations",
+            agent=RAGAgents.generation_agent()
+        )
+    
+    @staticmethod
+    def validate_response_task(generated_response: Dict[str, Any], original_docs: List[Dict[str, Any]]) -> Task:
+        """Create a task for validating the generated response."""
+        return Task(
+            description=_VALIDATE_RESPONSE_TEMPLATE.format(
+                response=generated_response.get('response', ''),
+                citations=generated_response.get('citations', []),
+                confidence=generated_response.get('confidence', 0),
+                documents=_dump_documents(original_docs[:2])
+            ),
+            expected_output="JSON validation report with issues and suggestions",
+            agent=RAGAgents.validation_agent()
+        )
+    
+    @staticmethod
+    def ingest_document_task(document_id: str, document_content: str) -> Task:
+        """Create a task for ingesting a document."""
+        return Task(
+            description=_INGEST_DOCUMENT_TEMPLATE.format(
+                document_id=document_id,
+                content_preview=document_content[:500]
+            ),
             expected_output="JSON document processing plan with chunking and embedding strategy",
             agent=RAGAgents.ingestion_agent()
         )
@@ -0,0 +1,34 @@
+"""
+Request models for the workflow endpoints
+Validated straight from the raw request body with pydantic's JSON parser
+"""
+from typing import Dict, List, Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class QueryRequest(BaseModel):
+    """Body of POST /api/workflows/query."""
+
+    query: str = Field(min_length=1)
+    documentIds: Optional[List[str]] = None
+    context: Dict[str, Any] = Field(default_factory=dict)
+
+
+class IngestRequest(BaseModel):
+    """Body of POST /api/workflows/ingest."""
+
+    documentId: str = Field(min_length=1)
+    content: str = Field(min_length=1)
+    context: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BatchIngestRequest(BaseModel):
+    """
+    Body of POST /api/workflows/batch-ingest.
+
+    Documents stay loosely typed so one malformed entry is reported in the
+    results instead of rejecting the whole batch.
+    """
+
+    documents: List[Dict[str, Any]] = Field(min_length=1)
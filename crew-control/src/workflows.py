@@ -5,10 +5,13 @@ Implements end-to-end query processing and document ingestion workflows
 import os
 import json
 import asyncio
+import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
 
+from agent_client import AgentClient
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -19,6 +22,11 @@ except ImportError:
     logger.warning("CrewAI not installed - running in mock mode")
 
 
+def _error_message(error: Exception) -> str:
+    """Describe an exception, falling back to its type when it has no message."""
+    return str(error) or type(error).__name__
+
+
 class WorkflowContext:
     """Context object passed through workflow execution."""
     
@@ -53,22 +61,18 @@ class WorkflowContext:
 
 
 class QueryWorkflow:
-    """Orchestrates the complete query processing workflow."""
+    """
+    Orchestrates the complete query processing workflow.
     
-    def __init__(self):
-        self.context = None
-        self.parsed_query = None
-        self.retrieved_docs = None
-        self.ranked_docs = None
-        self.generated_response = None
-        self.validation_result = None
+    Holds no per-run state, so a single instance can serve concurrent runs.
+    """
     
     async def execute(
         self,
         query: str,
         document_ids: Optional[List[str]] = None,
         context: Optional[WorkflowContext] = None,
-        agent_endpoints: Optional[Dict[str, str]] = None
+        agent_client: Optional[AgentClient] = None
     ) -> Dict[str, Any]:
         """
         Execute the complete query workflow.
@@ -83,44 +87,52 @@ class QueryWorkflow:
         if not context:
             context = WorkflowContext(trace_id='unknown', user_id='unknown')
         
-        self.context = context
-        
         try:
             # Step 1: Parse Query
             logger.info(f"[{context.trace_id}] Starting query workflow for: {query}")
-            self.parsed_query = await self._parse_query(query, agent_endpoints)
+            parsed_query = await self._parse_query(query, context, agent_client)
             
             # Step 2: Retrieve Documents
-            self.retrieved_docs = await self._retrieve_documents(
+            retrieved_docs = await self._retrieve_documents(
                 query,
-                self.parsed_query,
+                parsed_query,
                 document_ids,
-                agent_endpoints
+                context,
+                agent_client
             )
             
             # Step 3: Rank Documents
-            self.ranked_docs = await self._rank_documents(
+            ranked_docs = await self._rank_documents(
                 query,
-                self.retrieved_docs,
-                agent_endpoints
+                retrieved_docs,
+                context,
+                agent_client
             )
             
             # Step 4: Generate Response
-            self.generated_response = await self._generate_response(
+            generated_response = await self._generate_response(
                 query,
-                self.ranked_docs,
-                agent_endpoints
+                ranked_docs,
+                context,
+                agent_client
             )
             
             # Step 5: Validate Response
-            self.validation_result = await self._validate_response(
-                self.generated_response,
-                self.retrieved_docs,
-                agent_endpoints
+            validation_result = await self._validate_response(
+                generated_response,
+                retrieved_docs,
+                context,
+                agent_client
             )
             
             # Build final response
-            final_response = self._build_final_response()
+            final_response = self._build_final_response(
+                parsed_query,
+                retrieved_docs,
+                ranked_docs,
+                generated_response,
+                validation_result
+            )
             
             logger.info(f"[{context.trace_id}] Query workflow completed successfully")
             return {
@@ -135,14 +147,15 @@ class QueryWorkflow:
             }
             
         except Exception as e:
-            logger.error(f"[{context.trace_id}] Query workflow failed: {str(e)}")
-            context.add_error('workflow', str(e))
+            message = _error_message(e)
+            logger.error(f"[{context.trace_id}] Query workflow failed: {message}")
+            context.add_error('workflow', message)
             
             return {
                 'success': False,
                 'error': {
                     'code': 'QUERY_WORKFLOW_FAILED',
-                    'message': str(e),
+                    'message': message,
                     'traceId': context.trace_id
                 },
                 'metadata': {
@@ -155,22 +168,21 @@ class QueryWorkflow:
     async def _parse_query(
         self,
         query: str,
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> Dict[str, Any]:
         """Parse query using Query Parser Agent."""
-        import time
         start = time.time()
         
         try:
-            if agent_endpoints and 'query-parser' in agent_endpoints:
+            if agent_client and 'query-parser' in agent_client:
                 # Call actual agent service
-                import requests
-                response = requests.post(
-                    f"{agent_endpoints['query-parser']}/parse",
-                    json={'query': query},
+                result = await agent_client.post(
+                    'query-parser',
+                    '/parse',
+                    {'query': query},
                     timeout=10
                 )
-                result = response.json()
             else:
                 # Mock response
                 result = {
@@ -182,13 +194,13 @@ class QueryWorkflow:
                 }
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('parse_query', result, duration)
+            context.add_step('parse_query', result, duration)
             return result
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('parse_query', str(e))
-            self.context.add_step('parse_query', {}, duration)
+            context.add_error('parse_query', _error_message(e))
+            context.add_step('parse_query', {}, duration)
             raise
     
     async def _retrieve_documents(
@@ -196,25 +208,25 @@ class QueryWorkflow:
         query: str,
         parsed_query: Dict[str, Any],
         document_ids: Optional[List[str]],
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> List[Dict[str, Any]]:
         """Retrieve documents using Retrieval Agent."""
-        import time
         start = time.time()
         
         try:
-            if agent_endpoints and 'retrieval' in agent_endpoints:
-                import requests
-                response = requests.post(
-                    f"{agent_endpoints['retrieval']}/search",
-                    json={
+            if agent_client and 'retrieval' in agent_client:
+                response = await agent_client.post(
+                    'retrieval',
+                    '/search',
+                    {
                         'query': query,
                         'documentIds': document_ids,
                         'filters': parsed_query.get('constraints', {})
                     },
                     timeout=15
                 )
-                result = response.json().get('results', [])
+                result = response.get('results', [])
             else:
                 # Mock response
                 result = [
@@ -228,73 +240,72 @@ class QueryWorkflow:
                 ]
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('retrieve_documents', {'count': len(result)}, duration)
+            context.add_step('retrieve_documents', {'count': len(result)}, duration)
             return result
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('retrieve_documents', str(e))
-            self.context.add_step('retrieve_documents', {}, duration)
+            context.add_error('retrieve_documents', _error_message(e))
+            context.add_step('retrieve_documents', {}, duration)
             raise
     
     async def _rank_documents(
         self,
         query: str,
         retrieved_docs: List[Dict[str, Any]],
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> List[Dict[str, Any]]:
         """Rank documents using Ranking Agent."""
-        import time
         start = time.time()
         
         try:
-            if agent_endpoints and 'ranking' in agent_endpoints:
-                import requests
-                response = requests.post(
-                    f"{agent_endpoints['ranking']}/rank",
-                    json={
+            if agent_client and 'ranking' in agent_client:
+                response = await agent_client.post(
+                    'ranking',
+                    '/rank',
+                    {
                         'query': query,
                         'documents': retrieved_docs[:10]  # Top 10 only
                     },
                     timeout=10
                 )
-                result = response.json().get('ranked', retrieved_docs)
+                result = response.get('ranked', retrieved_docs)
             else:
                 # Mock: return as-is (assuming already scored)
                 result = retrieved_docs
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('rank_documents', {'count': len(result)}, duration)
+            context.add_step('rank_documents', {'count': len(result)}, duration)
             return result
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('rank_documents', str(e))
-            self.context.add_step('rank_documents', {}, duration)
+            context.add_error('rank_documents', _error_message(e))
+            context.add_step('rank_documents', {}, duration)
             raise
     
     async def _generate_response(
         self,
         query: str,
         ranked_docs: List[Dict[str, Any]],
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> Dict[str, Any]:
         """Generate response using Generation Agent."""
-        import time
         start = time.time()
         
         try:
-            if agent_endpoints and 'generation' in agent_endpoints:
-                import requests
-                response = requests.post(
-                    f"{agent_endpoints['generation']}/generate",
-                    json={
+            if agent_client and 'generation' in agent_client:
+                result = await agent_client.post(
+                    'generation',
+                    '/generate',
+                    {
                         'query': query,
                         'context': ranked_docs[:5]  # Top 5 chunks
                     },
                     timeout=20
                 )
-                result = response.json()
             else:
                 # Mock response
                 result = {
@@ -305,37 +316,36 @@ class QueryWorkflow:
                 }
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('generate_response', {'textLength': len(result.get('response', ''))}, duration)
+            context.add_step('generate_response', {'textLength': len(result.get('response', ''))}, duration)
             return result
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('generate_response', str(e))
-            self.context.add_step('generate_response', {}, duration)
+            context.add_error('generate_response', _error_message(e))
+            context.add_step('generate_response', {}, duration)
             raise
     
     async def _validate_response(
         self,
         generated_response: Dict[str, Any],
         context_docs: List[Dict[str, Any]],
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> Dict[str, Any]:
         """Validate response using Validation Agent."""
-        import time
         start = time.time()
         
         try:
-            if agent_endpoints and 'validation' in agent_endpoints:
-                import requests
-                response = requests.post(
-                    f"{agent_endpoints['validation']}/validate",
-                    json={
+            if agent_client and 'validation' in agent_client:
+                result = await agent_client.post(
+                    'validation',
+                    '/validate',
+                    {
                         'response': generated_response,
                         'context': context_docs[:5]
                     },
                     timeout=15
                 )
-                result = response.json()
             else:
                 # Mock validation
                 result = {
@@ -346,48 +356,54 @@ class QueryWorkflow:
                 }
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('validate_response', result, duration)
+            context.add_step('validate_response', result, duration)
             return result
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('validate_response', str(e))
-            self.context.add_step('validate_response', {}, duration)
+            context.add_error('validate_response', _error_message(e))
+            context.add_step('validate_response', {}, duration)
             raise
     
-    def _build_final_response(self) -> Dict[str, Any]:
+    def _build_final_response(
+        self,
+        parsed_query: Dict[str, Any],
+        retrieved_docs: List[Dict[str, Any]],
+        ranked_docs: List[Dict[str, Any]],
+        generated_response: Dict[str, Any],
+        validation_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
         """Build the final response from workflow results."""
         return {
-            'response': self.generated_response.get('response', ''),
-            'citations': self.generated_response.get('citations', []),
-            'confidence': self.generated_response.get('confidence', 0),
+            'response': generated_response.get('response', ''),
+            'citations': generated_response.get('citations', []),
+            'confidence': generated_response.get('confidence', 0),
             'validation': {
-                'passed': self.validation_result.get('passed', False),
-                'confidence': self.validation_result.get('confidence', 0),
-                'issues': self.validation_result.get('issues', [])
+                'passed': validation_result.get('passed', False),
+                'confidence': validation_result.get('confidence', 0),
+                'issues': validation_result.get('issues', [])
             },
             'context': {
-                'parsedQuery': self.parsed_query,
-                'documentsRetrieved': len(self.retrieved_docs),
-                'topDocuments': self.ranked_docs[:3] if self.ranked_docs else []
+                'parsedQuery': parsed_query,
+                'documentsRetrieved': len(retrieved_docs),
+                'topDocuments': ranked_docs[:3] if ranked_docs else []
             }
         }
 
 
 class IngestionWorkflow:
-    """Orchestrates the document ingestion workflow."""
+    """
+    Orchestrates the document ingestion workflow.
     
-    def __init__(self):
-        self.context = None
-        self.processing_plan = None
-        self.chunks = None
+    Like QueryWorkflow, instances are stateless and safe to share.
+    """
     
     async def execute(
         self,
         document_id: str,
         document_content: str,
         context: Optional[WorkflowContext] = None,
-        agent_endpoints: Optional[Dict[str, str]] = None
+        agent_client: Optional[AgentClient] = None
     ) -> Dict[str, Any]:
         """
         Execute the document ingestion workflow.
@@ -401,30 +417,31 @@ class IngestionWorkflow:
         if not context:
             context = WorkflowContext(trace_id='unknown', user_id='unknown')
         
-        self.context = context
-        
         try:
             logger.info(f"[{context.trace_id}] Starting ingestion workflow for document: {document_id}")
             
             # Step 1: Create processing plan
-            self.processing_plan = await self._plan_processing(
+            processing_plan = await self._plan_processing(
                 document_id,
                 document_content,
-                agent_endpoints
+                context,
+                agent_client
             )
             
             # Step 2: Generate chunks
-            self.chunks = await self._generate_chunks(
+            chunks = await self._generate_chunks(
                 document_id,
                 document_content,
-                self.processing_plan,
-                agent_endpoints
+                processing_plan,
+                context,
+                agent_client
             )
             
             # Step 3: Generate embeddings (handled by ingestion agent)
             embedding_result = await self._generate_embeddings(
-                self.chunks,
-                agent_endpoints
+                chunks,
+                context,
+                agent_client
             )
             
             logger.info(f"[{context.trace_id}] Ingestion workflow completed successfully")
@@ -432,9 +449,9 @@ class IngestionWorkflow:
                 'success': True,
                 'data': {
                     'documentId': document_id,
-                    'chunksCount': len(self.chunks),
+                    'chunksCount': len(chunks),
                     'embeddingsGenerated': embedding_result.get('count', 0),
-                    'processingPlan': self.processing_plan
+                    'processingPlan': processing_plan
                 },
                 'metadata': {
                     'executionTimeMs': context.get_duration_ms(),
@@ -444,14 +461,15 @@ class IngestionWorkflow:
             }
             
         except Exception as e:
-            logger.error(f"[{context.trace_id}] Ingestion workflow failed: {str(e)}")
-            context.add_error('workflow', str(e))
+            message = _error_message(e)
+            logger.error(f"[{context.trace_id}] Ingestion workflow failed: {message}")
+            context.add_error('workflow', message)
             
             return {
                 'success': False,
                 'error': {
                     'code': 'INGESTION_WORKFLOW_FAILED',
-                    'message': str(e),
+                    'message': message,
                     'traceId': context.trace_id
                 },
                 'metadata': {
@@ -465,24 +483,23 @@ class IngestionWorkflow:
         self,
         document_id: str,
         document_content: str,
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> Dict[str, Any]:
         """Create processing plan using Ingestion Agent."""
-        import time
         start = time.time()
         
         try:
-            if agent_endpoints and 'ingestion' in agent_endpoints:
-                import requests
-                response = requests.post(
-                    f"{agent_endpoints['ingestion']}/plan",
-                    json={
+            if agent_client and 'ingestion' in agent_client:
+                result = await agent_client.post(
+                    'ingestion',
+                    '/plan',
+                    {
                         'documentId': document_id,
                         'contentPreview': document_content[:1000]
                     },
                     timeout=10
                 )
-                result = response.json()
             else:
                 # Mock plan
                 result = {
@@ -494,13 +511,13 @@ class IngestionWorkflow:
                 }
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('plan_processing', result, duration)
+            context.add_step('plan_processing', result, duration)
             return result
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('plan_processing', str(e))
-            self.context.add_step('plan_processing', {}, duration)
+            context.add_error('plan_processing', _error_message(e))
+            context.add_step('plan_processing', {}, duration)
             raise
     
     async def _generate_chunks(
@@ -508,10 +525,10 @@ class IngestionWorkflow:
         document_id: str,
         document_content: str,
         plan: Dict[str, Any],
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> List[Dict[str, Any]]:
         """Generate chunks from document."""
-        import time
         start = time.time()
         
         try:
@@ -541,41 +558,40 @@ class IngestionWorkflow:
                 })
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('generate_chunks', {'count': len(chunks)}, duration)
+            context.add_step('generate_chunks', {'count': len(chunks)}, duration)
             return chunks
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('generate_chunks', str(e))
+            context.add_error('generate_chunks', _error_message(e))
             raise
     
     async def _generate_embeddings(
         self,
         chunks: List[Dict[str, Any]],
-        agent_endpoints: Optional[Dict[str, str]]
+        context: WorkflowContext,
+        agent_client: Optional[AgentClient]
     ) -> Dict[str, Any]:
         """Generate embeddings for chunks."""
-        import time
         start = time.time()
         
         try:
-            if agent_endpoints and 'ingestion' in agent_endpoints:
-                import requests
-                response = requests.post(
-                    f"{agent_endpoints['ingestion']}/embed",
-                    json={'chunks': chunks[:10]},  # Embed first 10
+            if agent_client and 'ingestion' in agent_client:
+                result = await agent_client.post(
+                    'ingestion',
+                    '/embed',
+                    {'chunks': chunks[:10]},  # Embed first 10
                     timeout=20
                 )
-                result = response.json()
             else:
                 # Mock embeddings
                 result = {'count': len(chunks)}
             
             duration = (time.time() - start) * 1000
-            self.context.add_step('generate_embeddings', result, duration)
+            context.add_step('generate_embeddings', result, duration)
             return result
             
         except Exception as e:
             duration = (time.time() - start) * 1000
-            self.context.add_error('generate_embeddings', str(e))
+            context.add_error('generate_embeddings', _error_message(e))
             raise